@@ -2,10 +2,16 @@
 import sqlite3
 import logging
 import os  # <-- Import para o caminho do DB
+import hmac
+import signal
+import threading
 from flask import Flask, request, jsonify
 from pyngrok import ngrok  # <-- O "túnel"
 import requests            # <-- Para falar com o Telegram
 from datetime import date
+from perfilador import PerfiladorAmostragem
+from dinheiro import para_centavos, formatar_centavos
+from esquema import cria_banco, soma_centavos
 
 # --- Configuração ---
 ngrok.set_auth_token("35QnfqzIsqoPS4rC0wQmUFcPq7Z_2VzZqDBYa2ba3H3WWck8C")
@@ -16,9 +22,15 @@ TOKEN = '8588201244:AAENwNnp0GjAB0WReGZWT7aMoud7KvqLRSw' # <-- Token do Telegram
 PASTA_ATUAL = os.path.dirname(os.path.abspath(__file__))
 DB_NAME = os.path.join(PASTA_ATUAL, 'finanzap.db') # <-- Banco salvo ao lado do app.py
 
+# Perfilador sob demanda (desligado por padrão)
+ADMIN_TOKEN = os.environ.get('FINANZA_ADMIN_TOKEN') # <-- Sem ele, a rota /admin fica bloqueada
+PASTA_PERFIS = os.environ.get('FINANZA_PASTA_PERFIS', os.path.join(PASTA_ATUAL, 'perfis'))
+TAXA_AMOSTRAGEM = max(0.0, min(1.0, float(os.environ.get('FINANZA_TAXA_AMOSTRAGEM', '0.1'))))
+
 # Configura o 'logging'
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 app = Flask(__name__)
+perfilador = PerfiladorAmostragem(PASTA_PERFIS, taxa_amostragem=TAXA_AMOSTRAGEM)
 # -----------------------------
 
 # --- [1] LÓGICA DO BANCO DE DADOS (O "CÉREBRO") ---
@@ -43,20 +55,10 @@ class GerenciadorBanco:
             logging.error(f"Erro no banco: {exc_value}")
         self.conexao_banco.close()
 
-def cria_banco(executor):
-    """Cria o banco de dados e a tabela transacoes, se não existirem."""
-    executor.execute('''
-        CREATE TABLE IF NOT EXISTS transacoes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tipo TEXT NOT NULL,
-            descricao TEXT NOT NULL,
-            valor REAL NOT NULL,
-            data TEXT NOT NULL
-        )
-    ''')
-
 def adiciona_transacao(executor, tipo, descricao, valor, data):
-    """Adiciona uma nova transação ao banco de dados."""
+    """Adiciona uma nova transação ao banco de dados ('valor' em centavos, int)."""
+    if not isinstance(valor, int):
+        raise TypeError(f"O valor deve ser em centavos (int), recebido: {valor!r}")
     comando_sql = '''
         INSERT INTO transacoes (tipo, descricao, valor, data)
         VALUES (?, ?, ?, ?)
@@ -115,36 +117,26 @@ def limpar_todas_transacoes(executor):
 # --- FUNÇÕES DE CÁLCULO E LÓGICA ---
 
 def calcular_saldo(executor):
-    """Calcula e retorna o saldo total de receitas, despesas e o saldo líquido."""
+    """Calcula e retorna o saldo total de receitas, despesas e o saldo líquido (em centavos)."""
     
     #1. Calcular total de receitas
-    executor.execute("SELECT SUM(valor) FROM transacoes WHERE tipo = ?", ('receita',))
-    resultado_receitas = executor.fetchone()[0]
-    total_receitas = resultado_receitas if resultado_receitas is not None else 0.0
+    total_receitas = soma_centavos(executor, "tipo = ?", ('receita',))
 
     #2. Calcular total de despesas
-    executor.execute("SELECT SUM(valor) FROM transacoes WHERE tipo = ?", ('despesa',))
-    resultado_despesas = executor.fetchone()[0]
-    total_despesas = resultado_despesas if resultado_despesas is not None else 0.0
+    total_despesas = soma_centavos(executor, "tipo = ?", ('despesa',))
 
     #3. Calcular saldo líquido
     saldo_liquido = total_receitas - total_despesas
     return total_receitas, total_despesas, saldo_liquido
 
 def calcular_saldo_periodo(executor, data_inicio, data_fim):
-    """Calcula o saldo total de receitas, despesas e o saldo líquido em um período específico."""
+    """Calcula o saldo total de receitas, despesas e o saldo líquido em um período específico (em centavos)."""
     
     #1. Calcular total de receitas no período
-    sql_receitas = '''SELECT SUM(valor) FROM transacoes WHERE tipo = 'receita' AND data BETWEEN ? AND ?'''
-    executor.execute(sql_receitas, (data_inicio, data_fim))
-    resultado_receitas = executor.fetchone()[0]
-    total_receitas = resultado_receitas if resultado_receitas is not None else 0.0
+    total_receitas = soma_centavos(executor, "tipo = 'receita' AND data BETWEEN ? AND ?", (data_inicio, data_fim))
 
     #2. Calcular total de despesas no período
-    sql_despesas = '''SELECT SUM(valor) FROM transacoes WHERE tipo = 'despesa' AND data BETWEEN ? AND ?'''
-    executor.execute(sql_despesas, (data_inicio, data_fim))
-    resultado_despesas = executor.fetchone()[0]
-    total_despesas = resultado_despesas if resultado_despesas is not None else 0.0
+    total_despesas = soma_centavos(executor, "tipo = 'despesa' AND data BETWEEN ? AND ?", (data_inicio, data_fim))
 
     #3. Calcular saldo líquido no período
     saldo_liquido = total_receitas - total_despesas
@@ -160,7 +152,31 @@ def home():
     return "API do Bot Finanza está no ar!"
 
 
+def comando_da_requisicao():
+    """
+    Descobre o comando (/add, /saldo, ...) da requisição, para agregar os perfis.
+    Segue a mesma regra do telegram_webhook, então só existem estes nomes +
+    'outros' (o usuário não consegue criar chaves novas mandando /x1, /x2, ...).
+    """
+    try:
+        update = request.get_json(silent=True)
+        mensagem = update.get('message') if isinstance(update, dict) else None
+        texto = mensagem.get('text') if isinstance(mensagem, dict) else None
+        if isinstance(texto, str):
+            texto = texto.strip()
+            if texto in ('/start', '/ajuda', '/listar', '/saldo'):
+                return texto
+            if texto.startswith('/del'):
+                return '/del'
+            if texto.startswith('/add'):
+                return '/add'
+    except Exception:
+        pass # Payload estranho não pode mudar o comportamento da rota; o webhook trata o erro
+    return 'outros'
+
+
 @app.route(f'/webhook/{TOKEN}', methods=['POST'])
+@perfilador.perfilar(comando_da_requisicao)
 def telegram_webhook():
     if request.json:
         update = request.json
@@ -191,7 +207,7 @@ def telegram_webhook():
                 "Aqui estão os comandos:\n"
                 "/listar - Lista todas as transações\n"
                 "/saldo - Mostra o saldo total\n"
-                "/add [tipo] [valor] [desc] (ex: /add despesa 50 mercado)"
+                "/add [tipo] [valor] [desc] (ex: /add despesa 50,90 mercado)"
                 "\n/del [ID] - Deleta a transação pelo ID"
             )
 
@@ -204,7 +220,7 @@ def telegram_webhook():
                 else:
                     resposta = "--- Suas Transações ---\n"
                     for t in transacoes:
-                        resposta += f"ID {t[0]}: {t[4]} | {t[2]} | R$ {t[3]:.2f} ({t[1]})\n"
+                        resposta += f"ID {t[0]}: {t[4]} | {t[2]} | R$ {formatar_centavos(t[3])} ({t[1]})\n"
             except Exception as e:
                 resposta = f"Erro ao buscar transações: {e}"
         
@@ -235,10 +251,10 @@ def telegram_webhook():
                     r, d, s = calcular_saldo(executor)
                 resposta = (
                     f"--- Balanço Total ---\n"
-                    f"✅ Receitas: R$ {r:.2f}\n"
-                    f"❌ Despesas: R$ {d:.2f}\n"
+                    f"✅ Receitas: R$ {formatar_centavos(r)}\n"
+                    f"❌ Despesas: R$ {formatar_centavos(d)}\n"
                     f"-----------------------\n"
-                    f"💰 Saldo: R$ {s:.2f}"
+                    f"💰 Saldo: R$ {formatar_centavos(s)}"
                 )
             except Exception as e:
                 resposta = f"Erro ao calcular saldo: {e}"
@@ -248,7 +264,7 @@ def telegram_webhook():
             try:
                 partes = texto.split(' ', 3) # Quebra o comando em 4 partes
                 tipo = partes[1].lower()     # 'despesa'
-                valor = float(partes[2])   # 50
+                valor = para_centavos(partes[2])   # '50,90' -> 5090 (centavos)
                 descricao = partes[3]      # 'mercado'
                 data_hoje = date.today().strftime("%Y-%m-%d")
 
@@ -257,7 +273,7 @@ def telegram_webhook():
                 else:
                     with GerenciadorBanco(DB_NAME) as executor:
                         novo_id = adiciona_transacao(executor, tipo, descricao, valor, data_hoje)
-                    resposta = f"✅ Sucesso! {tipo.capitalize()}: {descricao} (R$ {valor:.2f}). Adicionado!"
+                    resposta = f"✅ Sucesso! {tipo.capitalize()}: {descricao} (R$ {formatar_centavos(valor)}). Adicionado!"
             
             except Exception as e:
                 resposta = (
@@ -274,6 +290,37 @@ def telegram_webhook():
     return jsonify({"status": "ok"}), 200
 
 
+# Rota de administração do perfilador
+# Ex: curl -X POST -H "X-Admin-Token: ..." -H "Content-Type: application/json" \
+#          -d '{"acao": "ligar", "taxa": 0.25}' http://localhost:5000/admin/perfilador
+@app.route('/admin/perfilador', methods=['GET', 'POST'])
+def admin_perfilador():
+    token_recebido = request.headers.get('X-Admin-Token', '')
+    if not ADMIN_TOKEN or not hmac.compare_digest(token_recebido.encode(), ADMIN_TOKEN.encode()):
+        return jsonify({"status": "proibido"}), 403
+
+    if request.method == 'GET':
+        return jsonify(perfilador.status()), 200
+
+    dados = request.get_json(silent=True) or {}
+    acao = dados.get('acao')
+    arquivos = []
+
+    try:
+        if acao == 'ligar':
+            perfilador.ligar(dados.get('taxa'))
+        elif acao == 'desligar':
+            arquivos = perfilador.desligar()
+        elif acao == 'gravar':
+            arquivos = perfilador.gravar()
+        else:
+            return jsonify({"status": "erro", "detalhe": "Use acao = ligar, desligar ou gravar."}), 400
+    except (TypeError, ValueError) as e:
+        return jsonify({"status": "erro", "detalhe": str(e)}), 400
+
+    return jsonify({"status": "ok", "arquivos": arquivos, **perfilador.status()}), 200
+
+
 # Função helper para enviar a mensagem de volta
 def enviar_mensagem_telegram(chat_id, texto):
     """Envia uma mensagem de volta ao chat do Telegram."""
@@ -292,6 +339,10 @@ def enviar_mensagem_telegram(chat_id, texto):
 
 # --- [3] O (MAIN) ---
 
+def em_segundo_plano(funcao):
+    """Roda 'funcao' em uma thread separada (usado pelos handlers de sinal)."""
+    threading.Thread(target=funcao, name="perfilador-sinal", daemon=True).start()
+
 def main():
     # 0. Garante que o banco exista antes de tudo
     logging.info("Verificando banco de dados...")
@@ -299,6 +350,13 @@ def main():
         cria_banco(executor)
     logging.info("Banco de dados OK.")
 
+    # Sinais para o perfilador (só em sistemas Unix):
+    # kill -USR1 <pid> liga/desliga, kill -USR2 <pid> grava os perfis coletados
+    # O handler só dispara uma thread: join() ou escrita em disco no handler travaria a thread principal
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: em_segundo_plano(perfilador.alternar))
+        signal.signal(signal.SIGUSR2, lambda signum, frame: em_segundo_plano(perfilador.gravar))
+
     # 1. Inicia o 'ngrok' e pega a URL pública
     logging.info("Iniciando ngrok...")
     
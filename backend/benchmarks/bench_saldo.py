@@ -0,0 +1,104 @@
+"""
+Benchmark das somas de saldo com valores em centavos (INTEGER).
+
+Monta uma tabela com N transações (padrão: 10 milhões) usando o mesmo esquema
+do bot e mede calcular_saldo e calcular_saldo_periodo.
+
+Uso:
+    python backend/benchmarks/bench_saldo.py
+    python backend/benchmarks/bench_saldo.py --linhas 1000000 --db /tmp/bench.db
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cria_banco as cb  # noqa: E402
+
+
+def gera_transacoes(quantidade):
+    """
+    Gera transações determinísticas: 1/3 receitas, valores até R$ 1.000,00, datas em 2024.
+    O tipo depende de i // 12 (e o mês de i % 12), então todo mês tem receitas e despesas.
+    """
+    for i in range(quantidade):
+        tipo = 'receita' if (i // 12) % 3 == 0 else 'despesa'
+        centavos = (i * 7919) % 100_000
+        data = f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}"
+        yield (tipo, 'bench', centavos, data)
+
+
+def monta_banco(caminho, quantidade, tamanho_lote=100_000):
+    """Cria o banco (com o índice do esquema) e insere 'quantidade' transações."""
+    with cb.GerenciadorBanco(caminho) as executor:
+        cb.cria_banco(executor)
+        executor.execute('SELECT COUNT(*) FROM transacoes')
+        existentes = executor.fetchone()[0]
+        if existentes == quantidade:
+            return 0.0  # Reaproveita um banco já montado com --db
+        if existentes:
+            cb.limpar_todas_transacoes(executor)
+
+        inicio = time.perf_counter()
+        lote = []
+        for transacao in gera_transacoes(quantidade):
+            lote.append(transacao)
+            if len(lote) == tamanho_lote:
+                executor.executemany('INSERT INTO transacoes (tipo, descricao, valor, data) VALUES (?, ?, ?, ?)', lote)
+                lote.clear()
+        if lote:
+            executor.executemany('INSERT INTO transacoes (tipo, descricao, valor, data) VALUES (?, ?, ?, ?)', lote)
+    return time.perf_counter() - inicio
+
+
+def mede(nome, funcao, linhas, repeticoes):
+    """Roda 'funcao' algumas vezes e imprime o melhor tempo e a vazão sobre as 'linhas' lidas."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    melhor = min(tempos)
+    print(f"{nome:<45} {melhor:8.3f}s  {linhas / melhor / 1e6:8.1f}M linhas/s  -> {resultado}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark das somas de saldo em centavos.")
+    parser.add_argument('--linhas', type=int, default=10_000_000, help="Quantidade de transações (padrão: %(default)s).")
+    parser.add_argument('--db', help="Arquivo do banco (padrão: arquivo temporário apagado no fim).")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Repetições de cada medição (padrão: %(default)s).")
+    args = parser.parse_args(argv)
+
+    pasta_temporaria = None
+    caminho = args.db
+    if caminho is None:
+        pasta_temporaria = tempfile.TemporaryDirectory()
+        caminho = os.path.join(pasta_temporaria.name, 'bench.db')
+
+    try:
+        print(f"Montando {args.linhas:,} transações em {caminho}...")
+        tempo_insercao = monta_banco(caminho, args.linhas)
+        if tempo_insercao:
+            print(f"Inserção: {tempo_insercao:.1f}s ({args.linhas / tempo_insercao:,.0f} linhas/s)")
+
+        with cb.GerenciadorBanco(caminho) as executor:
+            mede("calcular_saldo", lambda: cb.calcular_saldo(executor), args.linhas, args.repeticoes)
+
+            # Um mês: a vazão é calculada só sobre as linhas do período (~1/12 da tabela)
+            executor.execute("SELECT COUNT(*) FROM transacoes WHERE data BETWEEN '2024-03-01' AND '2024-03-31'")
+            linhas_periodo = executor.fetchone()[0]
+            mede(f"calcular_saldo_periodo (1 mês, {linhas_periodo:,} linhas)",
+                 lambda: cb.calcular_saldo_periodo(executor, '2024-03-01', '2024-03-31'),
+                 linhas_periodo, args.repeticoes)
+    finally:
+        if pasta_temporaria is not None:
+            pasta_temporaria.cleanup()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
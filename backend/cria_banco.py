@@ -1,6 +1,11 @@
 import os
+import sys
+import json
 import sqlite3
+import argparse
 from datetime import date
+from dinheiro import para_centavos, formatar_centavos
+from esquema import cria_banco, soma_centavos
 
 # --- CONFIGURAÇÃO GLOBAL ---
 Pasta_ATUAL = os.path.dirname(os.path.abspath(__file__))
@@ -29,27 +34,17 @@ class GerenciadorBanco:
             self.conexao_banco.commit()
         else:
             self.conexao_banco.rollback()
-            print(f"Erro ocorrido: {exc_value}")
+            print(f"Erro ocorrido: {exc_value}", file=sys.stderr) # stderr: no modo lote, stdout é só JSON
 
         self.conexao_banco.close()
         return False
 
 # --- FUNÇÕES DE OPERAÇÃO DO BANCO (CRUD) ---
 
-def cria_banco(executor):
-    """Cria o banco de dados e a tabela transacoes, se não existirem."""
-    executor.execute('''
-        CREATE TABLE IF NOT EXISTS transacoes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tipo TEXT NOT NULL,
-            descricao TEXT NOT NULL,
-            valor REAL NOT NULL,
-            data TEXT NOT NULL
-        )
-    ''')
-
 def adiciona_transacao(executor, tipo, descricao, valor, data):
-    """Adiciona uma nova transação ao banco de dados."""
+    """Adiciona uma nova transação ao banco de dados ('valor' em centavos, int)."""
+    if not isinstance(valor, int):
+        raise TypeError(f"O valor deve ser em centavos (int), recebido: {valor!r}")
     comando_sql = '''
         INSERT INTO transacoes (tipo, descricao, valor, data)
         VALUES (?, ?, ?, ?)
@@ -57,6 +52,8 @@ def adiciona_transacao(executor, tipo, descricao, valor, data):
     dados_transacao = (tipo, descricao, valor, data)
     executor.execute(comando_sql, dados_transacao)
 
+    return executor.lastrowid # Retorna o ID da nova transação
+
 def listar_transacoes(executor):
     """Retorna todas as transações do banco de dados."""
     comando_sql = 'SELECT * FROM transacoes'
@@ -74,10 +71,10 @@ def deletar_transacao_por_id(executor, id_para_deletar):
     comando_sql = 'DELETE FROM transacoes WHERE id = ?'
     executor.execute(comando_sql, (id_para_deletar,))
 
-    if executor.rowcount == 0:
-        print(f"Nenhuma transação encontrada com ID {id_para_deletar}.")
-    else:
-        print(f"Transação com ID {id_para_deletar} deletada com sucesso.")
+    # Retorna o número de linhas afetadas (0 se não achou, 1 se deletou)
+    return executor.rowcount
+
+CAMPOS_ATUALIZAVEIS = ['descricao', 'valor', 'data', 'tipo']
 
 def atualizar_campo_transacao(executor, id_para_atualizar, nome_campo, novo_valor):
     """
@@ -85,18 +82,15 @@ def atualizar_campo_transacao(executor, id_para_atualizar, nome_campo, novo_valo
     de uma transação com base no ID.
     """
     
-    if nome_campo not in ['descricao', 'valor', 'data', 'tipo']:
-        print(f"Erro: Campo '{nome_campo}' não é permitido para atualização.")
-        return
+    if nome_campo not in CAMPOS_ATUALIZAVEIS:
+        raise ValueError(f"Campo '{nome_campo}' não é permitido para atualização.")
     
     comando_sql = f"UPDATE transacoes SET {nome_campo} = ? WHERE id = ?"
     
     executor.execute(comando_sql, (novo_valor, id_para_atualizar))
     
-    if executor.rowcount == 0:
-        print(f"Aviso: Nenhuma transação encontrada com o ID {id_para_atualizar}.")
-    else:
-        print(f"Sucesso: Campo '{nome_campo}' da transação ID {id_para_atualizar} atualizado.")
+    # Retorna o número de linhas afetadas (0 se não achou, 1 se atualizou)
+    return executor.rowcount
 
 def limpar_todas_transacoes(executor):
     """Deleta todas as transações do banco de dados e reseta o ID."""
@@ -108,47 +102,202 @@ def limpar_todas_transacoes(executor):
 # --- FUNÇÕES DE CÁLCULO E LÓGICA ---
 
 def calcular_saldo(executor):
-    """Calcula e retorna o saldo total de receitas, despesas e o saldo líquido."""
+    """Calcula e retorna o saldo total de receitas, despesas e o saldo líquido (em centavos)."""
     
     #1. Calcular total de receitas
-    executor.execute("SELECT SUM(valor) FROM transacoes WHERE tipo = ?", ('receita',))
-    resultado_receitas = executor.fetchone()[0]
-    total_receitas = resultado_receitas if resultado_receitas is not None else 0.0
+    total_receitas = soma_centavos(executor, "tipo = ?", ('receita',))
 
     #2. Calcular total de despesas
-    executor.execute("SELECT SUM(valor) FROM transacoes WHERE tipo = ?", ('despesa',))
-    resultado_despesas = executor.fetchone()[0]
-    total_despesas = resultado_despesas if resultado_despesas is not None else 0.0
+    total_despesas = soma_centavos(executor, "tipo = ?", ('despesa',))
 
     #3. Calcular saldo líquido
     saldo_liquido = total_receitas - total_despesas
     return total_receitas, total_despesas, saldo_liquido
 
 def calcular_saldo_periodo(executor, data_inicio, data_fim):
-    """Calcula o saldo total de receitas, despesas e o saldo líquido em um período específico."""
+    """Calcula o saldo total de receitas, despesas e o saldo líquido em um período específico (em centavos)."""
     
     #1. Calcular total de receitas no período
-    sql_receitas = '''SELECT SUM(valor) FROM transacoes WHERE tipo = 'receita' AND data BETWEEN ? AND ?'''
-    executor.execute(sql_receitas, (data_inicio, data_fim))
-    resultado_receitas = executor.fetchone()[0]
-    total_receitas = resultado_receitas if resultado_receitas is not None else 0.0
+    total_receitas = soma_centavos(executor, "tipo = 'receita' AND data BETWEEN ? AND ?", (data_inicio, data_fim))
 
     #2. Calcular total de despesas no período
-    sql_despesas = '''SELECT SUM(valor) FROM transacoes WHERE tipo = 'despesa' AND data BETWEEN ? AND ?'''
-    executor.execute(sql_despesas, (data_inicio, data_fim))
-    resultado_despesas = executor.fetchone()[0]
-    total_despesas = resultado_despesas if resultado_despesas is not None else 0.0
+    total_despesas = soma_centavos(executor, "tipo = 'despesa' AND data BETWEEN ? AND ?", (data_inicio, data_fim))
 
     #3. Calcular saldo líquido no período
     saldo_liquido = total_receitas - total_despesas
     return total_receitas, total_despesas, saldo_liquido
 
+# --- MODO LOTE (NÃO INTERATIVO) ---
+#
+# Lê uma operação por linha, de um arquivo ou da entrada padrão, em um destes formatos:
+#
+#   add despesa 50,90 mercado           {"op": "add", "tipo": "despesa", "valor": 50, "descricao": "mercado", "data": "2024-01-31"}
+#   update 3 valor 75,50                {"op": "update", "id": 3, "campo": "valor", "valor": 75.5}
+#   del 3                               {"op": "del", "id": 3}
+#   saldo                               {"op": "saldo"}
+#   saldo 2024-01-01 2024-01-31         {"op": "saldo", "inicio": "2024-01-01", "fim": "2024-01-31"}
+#
+# Linhas em branco e começando com '#' são ignoradas. Tudo roda em UMA conexão,
+# com COMMIT a cada 'tamanho_lote' operações, e cada resultado sai como uma linha JSON
+# (só depois do COMMIT do seu lote, para nunca mostrar 'ok' de algo que foi desfeito).
+
+ALIASES_OPERACAO = {
+    'add': 'add',
+    'update': 'update',
+    'del': 'del',
+    'delete': 'del',
+    'saldo': 'saldo',
+    'balance': 'saldo',
+}
+
+def interpretar_linha(linha):
+    """Converte uma linha (texto simples ou JSON) em um dicionário de operação."""
+    if linha.startswith('{'):
+        operacao = json.loads(linha)
+        if not isinstance(operacao, dict):
+            raise ValueError("Operação JSON deve ser um objeto.")
+    else:
+        partes = linha.split(None, 1)
+        nome = partes[0].lower()
+        resto = partes[1] if len(partes) > 1 else ''
+
+        if nome == 'add':
+            tipo, valor, descricao = resto.split(None, 2)
+            operacao = {'tipo': tipo, 'valor': valor, 'descricao': descricao}
+        elif nome == 'update':
+            id_transacao, campo, valor = resto.split(None, 2)
+            operacao = {'id': id_transacao, 'campo': campo, 'valor': valor}
+        elif nome in ('del', 'delete'):
+            operacao = {'id': resto}
+        elif nome in ('saldo', 'balance'):
+            datas = resto.split()
+            if len(datas) not in (0, 2):
+                raise ValueError("Use 'saldo' ou 'saldo [inicio] [fim]' (AAAA-MM-DD).")
+            operacao = {'inicio': datas[0], 'fim': datas[1]} if datas else {}
+        else:
+            operacao = {}
+        operacao['op'] = nome
+
+    nome = ALIASES_OPERACAO.get(str(operacao.get('op', '')).lower())
+    if nome is None:
+        raise ValueError(f"Operação desconhecida: {operacao.get('op')!r}.")
+    operacao['op'] = nome
+    return operacao
+
+def executar_operacao(executor, operacao, data_hoje):
+    """Executa uma operação já interpretada e retorna o dicionário de resultado."""
+    nome = operacao['op']
+
+    if nome == 'add':
+        tipo = operacao['tipo'].lower()
+        if tipo not in ('receita', 'despesa'):
+            raise ValueError("Tipo inválido. Use 'receita' ou 'despesa'.")
+        valor = para_centavos(operacao['valor'])
+        novo_id = adiciona_transacao(executor, tipo, operacao['descricao'], valor, operacao.get('data', data_hoje))
+        return {'id': novo_id}
+
+    if nome == 'update':
+        campo = operacao['campo']
+        novo_valor = operacao['valor']
+        if campo == 'valor':
+            novo_valor = para_centavos(novo_valor)
+        elif campo == 'tipo' and novo_valor not in ('receita', 'despesa'):
+            raise ValueError("Tipo inválido. Use 'receita' ou 'despesa'.")
+        return {'linhas_afetadas': atualizar_campo_transacao(executor, int(operacao['id']), campo, novo_valor)}
+
+    if nome == 'del':
+        return {'linhas_afetadas': deletar_transacao_por_id(executor, int(operacao['id']))}
+
+    # nome == 'saldo'
+    if 'inicio' in operacao:
+        r, d, s = calcular_saldo_periodo(executor, operacao['inicio'], operacao['fim'])
+    else:
+        r, d, s = calcular_saldo(executor)
+    return {'receitas_centavos': r, 'despesas_centavos': d, 'saldo_centavos': s}
+
+def executar_lote(entrada, saida, db_name=DB_NAME, tamanho_lote=5000):
+    """
+    Executa todas as operações de 'entrada' em uma única conexão, com COMMIT
+    a cada 'tamanho_lote' operações. Retorna (total de operações, total de erros).
+    """
+    if tamanho_lote < 1:
+        raise ValueError("O tamanho do lote deve ser um inteiro positivo.")
+
+    data_hoje = date.today().strftime("%Y-%m-%d")
+    total = erros = 0
+    pendentes = [] # Resultados do lote atual: só são impressos depois do COMMIT
+
+    def imprime_pendentes():
+        saida.write(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in pendentes))
+        pendentes.clear()
+
+    with GerenciadorBanco(db_name) as executor:
+        cria_banco(executor)
+        conexao = executor.connection
+
+        for numero_linha, linha in enumerate(entrada, start=1):
+            linha = linha.strip()
+            if not linha or linha.startswith('#'):
+                continue
+
+            total += 1
+            resultado = {'linha': numero_linha, 'op': None}
+            try:
+                operacao = interpretar_linha(linha)
+                resultado['op'] = operacao['op']
+                resultado.update(ok=True, **executar_operacao(executor, operacao, data_hoje))
+            except Exception as e: # Uma linha ruim vira uma linha de erro, nunca derruba o lote
+                erros += 1
+                resultado.update(ok=False, erro=str(e) or type(e).__name__)
+            pendentes.append(resultado)
+
+            if total % tamanho_lote == 0:
+                conexao.commit()
+                imprime_pendentes()
+
+    # Saiu do 'with' sem erro: o GerenciadorBanco já fez o COMMIT do último lote
+    imprime_pendentes()
+    return total, erros
+
+def inteiro_positivo(texto):
+    """Tipo do argparse para números inteiros maiores que zero."""
+    try:
+        numero = int(texto)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"'{texto}' não é um número inteiro.") from None
+    if numero < 1:
+        raise argparse.ArgumentTypeError(f"deve ser maior que zero (recebido: {numero}).")
+    return numero
+
 # --- FUNÇÃO PRINCIPAL (MENU DA APLICAÇÃO) ---
 
-def main():
-    """Função principal que executa o menu interativo."""
+def main(argv=None):
+    """Ponto de entrada: sem argumentos abre o menu interativo; com --lote roda em modo lote."""
+    parser = argparse.ArgumentParser(description="Gerenciador do banco de dados Finanza.")
+    parser.add_argument('--lote', metavar='ARQUIVO',
+                        help="Executa as operações do arquivo (use '-' para a entrada padrão) e sai.")
+    parser.add_argument('--db', default=DB_NAME, help="Caminho do banco de dados (padrão: %(default)s).")
+    parser.add_argument('--tamanho-lote', type=inteiro_positivo, default=5000,
+                        help="Quantidade de operações por transação no modo lote (padrão: %(default)s).")
+    args = parser.parse_args(argv)
+
+    if args.lote is None:
+        menu_interativo(args.db)
+        return 0
+
+    if args.lote == '-':
+        total, erros = executar_lote(sys.stdin, sys.stdout, args.db, args.tamanho_lote)
+    else:
+        with open(args.lote, encoding='utf-8') as entrada:
+            total, erros = executar_lote(entrada, sys.stdout, args.db, args.tamanho_lote)
+
+    print(f"{total} operações executadas, {erros} com erro.", file=sys.stderr)
+    return 1 if erros else 0
+
+def menu_interativo(db_name=DB_NAME):
+    """Executa o menu interativo."""
     
-    with GerenciadorBanco(DB_NAME) as executor:
+    with GerenciadorBanco(db_name) as executor:
         cria_banco(executor)
 
     while True:
@@ -196,7 +345,7 @@ def main():
             
             # (O seu código do valor vem aqui)
             try:
-                valor = float(input(f"Valor da {tipo}: R$ "))
+                valor = para_centavos(input(f"Valor da {tipo}: R$ "))
             except ValueError:
                 print("Erro: Valor inválido. Deve ser um número. Transação cancelada.")
                 input("\nPressione Enter para voltar ao menu...")
@@ -204,7 +353,7 @@ def main():
             
             # (O resto do código 'try...with' para adicionar)
             try:
-                with GerenciadorBanco(DB_NAME) as executor:
+                with GerenciadorBanco(db_name) as executor:
                     adiciona_transacao(executor, tipo, descricao, valor, data)
                 print("\nSucesso! Transação adicionada.")
             
@@ -216,14 +365,14 @@ def main():
         elif escolha == '2':
             print("\n--- Todas as Transações ---")
             
-            with GerenciadorBanco(DB_NAME) as executor:
+            with GerenciadorBanco(db_name) as executor:
                 transacoes = listar_transacoes(executor)
             
             if not transacoes:
                 print("Nenhuma transação encontrada.")
             else:
                 for t in transacoes:
-                    print(f"ID: {t[0]} | Tipo: {t[1]} | Data: {t[4]} | Desc: {t[2]} | Valor: R$ {t[3]:.2f}")
+                    print(f"ID: {t[0]} | Tipo: {t[1]} | Data: {t[4]} | Desc: {t[2]} | Valor: R$ {formatar_centavos(t[3])}")
             
             input("\nPressione Enter para voltar ao menu...")
 
@@ -261,7 +410,7 @@ def main():
             elif sub_escolha == '2':
                 nome_campo = 'valor'
                 try:
-                    novo_valor = float(input("Digite o NOVO valor: R$ "))
+                    novo_valor = para_centavos(input("Digite o NOVO valor: R$ "))
                 except ValueError:
                     print("Erro: Valor inválido.")
                     input("\nPressione Enter para voltar ao menu...")
@@ -294,8 +443,13 @@ def main():
 
             # 4. Chamar a nova função do banco
             try:
-                with GerenciadorBanco(DB_NAME) as executor:
-                    atualizar_campo_transacao(executor, id_para_atualizar, nome_campo, novo_valor)
+                with GerenciadorBanco(db_name) as executor:
+                    linhas_afetadas = atualizar_campo_transacao(executor, id_para_atualizar, nome_campo, novo_valor)
+
+                if linhas_afetadas == 0:
+                    print(f"Aviso: Nenhuma transação encontrada com o ID {id_para_atualizar}.")
+                else:
+                    print(f"Sucesso: Campo '{nome_campo}' da transação ID {id_para_atualizar} atualizado.")
             
             except sqlite3.Error as e:
                 print(f"\nErro ao atualizar transação: {e}")
@@ -313,8 +467,13 @@ def main():
                 continue
 
             try:
-                with GerenciadorBanco(DB_NAME) as executor:
-                    deletar_transacao_por_id(executor, id_para_deletar)
+                with GerenciadorBanco(db_name) as executor:
+                    linhas_afetadas = deletar_transacao_por_id(executor, id_para_deletar)
+
+                if linhas_afetadas == 0:
+                    print(f"Nenhuma transação encontrada com ID {id_para_deletar}.")
+                else:
+                    print(f"Transação com ID {id_para_deletar} deletada com sucesso.")
 
             except sqlite3.Error as e:
                 print(f"\nErro ao deletar transação: {e}")
@@ -324,12 +483,12 @@ def main():
         elif escolha == '5':
             print("\n--- Saldo Total ---")
             try:
-                with GerenciadorBanco(DB_NAME) as executor:
+                with GerenciadorBanco(db_name) as executor:
                     total_receitas, total_despesas, saldo_liquido = calcular_saldo(executor)
                 
-                print(f"Total de Receitas: R$ {total_receitas:.2f}")
-                print(f"Total de Despesas: R$ {total_despesas:.2f}")
-                print(f"Saldo Líquido: R$ {saldo_liquido:.2f}")
+                print(f"Total de Receitas: R$ {formatar_centavos(total_receitas)}")
+                print(f"Total de Despesas: R$ {formatar_centavos(total_despesas)}")
+                print(f"Saldo Líquido: R$ {formatar_centavos(saldo_liquido)}")
 
             except sqlite3.Error as e:
                 print(f"\nErro ao calcular saldo: {e}")
@@ -342,12 +501,12 @@ def main():
             data_fim = input("Data de Fim (AAAA-MM-DD): ")
 
             try:
-                with GerenciadorBanco(DB_NAME) as executor:
+                with GerenciadorBanco(db_name) as executor:
                     total_receitas, total_despesas, saldo_liquido = calcular_saldo_periodo(executor, data_inicio, data_fim)
-                print(f"Total de Receitas no Período: R$ {total_receitas:.2f}")
-                print(f"Total de Despesas no Período: R$ {total_despesas:.2f}")
+                print(f"Total de Receitas no Período: R$ {formatar_centavos(total_receitas)}")
+                print(f"Total de Despesas no Período: R$ {formatar_centavos(total_despesas)}")
                 print('-------------------------------------')
-                print(f"Saldo Líquido no Período: R$ {saldo_liquido:.2f}")
+                print(f"Saldo Líquido no Período: R$ {formatar_centavos(saldo_liquido)}")
 
             except sqlite3.Error as e:
                 print(f"\nErro ao calcular saldo no período: {e}")
@@ -359,7 +518,7 @@ def main():
             confirmacao = input("Tem certeza que deseja deletar todas as transações? (s/n): ").lower()
             if confirmacao == 's':
                 try:
-                    with GerenciadorBanco(DB_NAME) as executor:
+                    with GerenciadorBanco(db_name) as executor:
                         limpar_todas_transacoes(executor)
                 except sqlite3.Error as e:
                     print(f"\nErro ao limpar transações: {e}")
@@ -374,4 +533,4 @@ def main():
 # --- PONTO DE ENTRADA DA APLICAÇÃO ---
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
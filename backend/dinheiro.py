@@ -0,0 +1,71 @@
+import re
+from decimal import Decimal, DecimalException, Inexact, localcontext
+
+# --- VALORES EM CENTAVOS ---
+#
+# Todo valor monetário é guardado no banco como INTEGER em centavos
+# (R$ 50,90 -> 5090). Assim as somas são exatas, sem o erro acumulado do REAL.
+
+# Maior valor aceito em UMA transação: R$ 100 bilhões (10^13 centavos).
+# Bem abaixo do limite do INTEGER do SQLite (~9,2 * 10^18), para que somas
+# de muitas transações não estourem com facilidade (ver esquema.soma_centavos).
+LIMITE_CENTAVOS = 10**13
+
+# Formatos aceitos: só dígitos, com sinal opcional. Nada de '1_000' ou '1e2'.
+PADRAO_PONTO = re.compile(r'[+-]?\d+(\.\d+)?')                      # 50 | 50.9 | 50.90
+PADRAO_BRASILEIRO = re.compile(r'[+-]?(\d+|\d{1,3}(\.\d{3})+),\d+')  # 50,90 | 1.234,56
+
+
+def para_centavos(valor):
+    """
+    Converte um valor digitado (ex: '50', '50,90', '50.90', '1.234,56', 'R$ 10')
+    ou numérico (int/float/Decimal) para centavos (int).
+    Lança ValueError se o valor for inválido, tiver mais de 2 casas decimais
+    ou passar de LIMITE_CENTAVOS.
+    """
+    if isinstance(valor, bool):
+        raise ValueError(f"Valor inválido: {valor!r}")
+
+    if isinstance(valor, int):
+        centavos = valor * 100
+    else:
+        if isinstance(valor, float):
+            texto = repr(valor)  # repr é a menor string que representa o float (50.9 -> '50.9')
+        else:
+            texto = str(valor).strip()
+            if texto.upper().startswith('R$'):
+                texto = texto[2:].strip()
+
+            if ',' in texto:
+                # Formato brasileiro: '.' separa milhar e ',' separa os centavos
+                if not PADRAO_BRASILEIRO.fullmatch(texto):
+                    raise ValueError(f"Valor inválido: {valor!r}")
+                texto = texto.replace('.', '').replace(',', '.')
+            elif not PADRAO_PONTO.fullmatch(texto):
+                raise ValueError(f"Valor inválido: {valor!r}")
+
+        with localcontext() as contexto:
+            contexto.traps[Inexact] = True  # Qualquer arredondamento vira erro, nunca perda silenciosa
+            try:
+                numero = Decimal(texto)
+                if not numero.is_finite():
+                    raise ValueError(f"Valor inválido: {valor!r}")
+                if numero.adjusted() > 17:  # Mais de 10^18 reais nunca cabe; evita estourar a precisão do Decimal
+                    raise ValueError(f"Valor fora do limite permitido: {valor!r}")
+                centavos = int(numero.quantize(Decimal('0.01')).scaleb(2))
+            except Inexact:
+                raise ValueError(f"Valor com mais de 2 casas decimais: {valor!r}") from None
+            except DecimalException:
+                raise ValueError(f"Valor inválido: {valor!r}") from None
+
+    if abs(centavos) > LIMITE_CENTAVOS:
+        raise ValueError(f"Valor fora do limite permitido: {valor!r}")
+
+    return centavos
+
+
+def formatar_centavos(centavos):
+    """Formata centavos (int) como texto com duas casas (ex: 5090 -> '50.90')."""
+    sinal = '-' if centavos < 0 else ''
+    reais, resto = divmod(abs(centavos), 100)
+    return f"{sinal}{reais}.{resto:02d}"
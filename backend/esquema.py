@@ -0,0 +1,94 @@
+# --- ESQUEMA DO BANCO (COMPARTILHADO) ---
+#
+# Usado por app.py e cria_banco.py: a criação da tabela e a migração
+# precisam ser idênticas nos dois, então ficam só aqui.
+
+import sqlite3
+
+from dinheiro import LIMITE_CENTAVOS
+
+# 'valor' é guardado em centavos (INTEGER) para que as somas sejam exatas
+SQL_CRIA_TABELA = '''
+    CREATE TABLE IF NOT EXISTS transacoes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        tipo TEXT NOT NULL,
+        descricao TEXT NOT NULL,
+        valor INTEGER NOT NULL,
+        data TEXT NOT NULL
+    )
+'''
+VERSAO_BANCO = 1 # <-- 0: valor em reais (REAL) | 1: valor em centavos (INTEGER)
+
+def cria_banco(executor):
+    """Cria o banco de dados e a tabela transacoes, se não existirem, e migra bancos antigos."""
+    if not executor.connection.in_transaction:
+        executor.execute('BEGIN') # DDL fora de transação faria commit sozinho no meio da migração
+
+    executor.execute(SQL_CRIA_TABELA)
+    migra_valor_para_centavos(executor)
+
+    # Índice de cobertura: os SUMs por tipo (e por período) leem só o índice, sem tocar a tabela
+    executor.execute('CREATE INDEX IF NOT EXISTS idx_transacoes_tipo_data_valor ON transacoes (tipo, data, valor)')
+
+def migra_valor_para_centavos(executor):
+    """
+    Migração única: converte a coluna 'valor' de REAL (reais) para INTEGER (centavos).
+    Usa o PRAGMA user_version para não rodar de novo. Retorna True se migrou.
+    """
+    executor.execute('PRAGMA user_version')
+    if executor.fetchone()[0] >= VERSAO_BANCO:
+        return False
+
+    executor.execute('PRAGMA table_info(transacoes)')
+    tipos_colunas = {coluna[1]: coluna[2].upper() for coluna in executor.fetchall()}
+    migrou = tipos_colunas.get('valor') == 'REAL'
+
+    if migrou:
+        # Antes de mexer em qualquer coisa: valores que não viram centavos exatos
+        # (ex: 1.005) ou que passam do limite abortam a migração, nunca são arredondados
+        executor.execute('''
+            SELECT id, valor FROM transacoes
+            WHERE ABS(valor * 100 - ROUND(valor * 100)) > 1e-6 OR ABS(valor * 100) > ?
+            ORDER BY id
+        ''', (LIMITE_CENTAVOS,))
+        invalidas = executor.fetchall()
+        if invalidas:
+            detalhes = ', '.join(f"ID {id_transacao}: {valor!r}" for id_transacao, valor in invalidas[:20])
+            raise ValueError(
+                f"Migração para centavos abortada: {len(invalidas)} transação(ões) com valor que não é "
+                f"exato em centavos ou passa de R$ {LIMITE_CENTAVOS // 100} ({detalhes}). "
+                f"Corrija esses valores e inicie de novo; nada foi alterado."
+            )
+
+        executor.execute('ALTER TABLE transacoes RENAME TO transacoes_reais')
+        executor.execute(SQL_CRIA_TABELA)
+        executor.execute('''
+            INSERT INTO transacoes (id, tipo, descricao, valor, data)
+            SELECT id, tipo, descricao, CAST(ROUND(valor * 100) AS INTEGER), data FROM transacoes_reais
+        ''')
+        # Mantém o contador do AUTOINCREMENT, para não reaproveitar IDs já deletados
+        executor.execute('''
+            UPDATE sqlite_sequence
+            SET seq = MAX(seq, (SELECT seq FROM sqlite_sequence WHERE name = 'transacoes_reais'))
+            WHERE name = 'transacoes'
+        ''')
+        executor.execute('DROP TABLE transacoes_reais')
+
+    executor.execute(f'PRAGMA user_version = {VERSAO_BANCO}')
+    return migrou
+
+def soma_centavos(executor, condicao, parametros=()):
+    """
+    Retorna SUM(valor) das transações que atendem 'condicao' (0 se não houver nenhuma).
+    Se a soma passar do INTEGER do SQLite (64 bits), o SQLite dá 'integer overflow';
+    nesse caso a soma é refeita em Python, que não tem limite para inteiros.
+    """
+    try:
+        executor.execute(f"SELECT SUM(valor) FROM transacoes WHERE {condicao}", parametros)
+        total = executor.fetchone()[0]
+    except sqlite3.OperationalError as e:
+        if 'overflow' not in str(e):
+            raise
+        executor.execute(f"SELECT valor FROM transacoes WHERE {condicao}", parametros)
+        total = sum(valor for (valor,) in executor)
+    return total if total is not None else 0
@@ -0,0 +1,185 @@
+import os
+import sys
+import time
+import random
+import logging
+import threading
+from collections import Counter, defaultdict
+from functools import wraps
+
+# --- PERFILADOR POR AMOSTRAGEM (SOB DEMANDA) ---
+#
+# Enquanto está ativo, uma thread "amostradora" olha periodicamente a pilha
+# das threads que estão atendendo uma requisição sorteada e conta quantas
+# vezes cada pilha aparece, separado por comando (/add, /saldo, ...).
+# O resultado é gravado no formato "collapsed" (uma pilha por linha + contagem),
+# que é o formato aceito pelo flamegraph.pl, speedscope e afins.
+#
+# Desligado, o custo por requisição é só a leitura de um booleano.
+
+
+class PerfiladorAmostragem:
+    """Perfilador de pilha por amostragem, ligado e desligado em tempo de execução."""
+
+    def __init__(self, pasta_saida, taxa_amostragem=0.1, intervalo=0.005):
+        self.pasta_saida = pasta_saida
+        self.taxa_amostragem = taxa_amostragem  # Fração das requisições perfiladas (0.0 a 1.0)
+        self.intervalo = intervalo              # Segundos entre duas amostras
+        self.ativo = False
+
+        self._trava = threading.Lock()
+        self._threads_alvo = {}                 # ident da thread -> comando
+        self._pilhas = defaultdict(Counter)     # comando -> Counter(pilha -> amostras)
+        self._requisicoes = Counter()           # comando -> requisições perfiladas
+        self._amostrador = None
+        self._parar_amostrador = None           # Event próprio de cada amostrador (ver desligar)
+        self._sequencia = 0
+
+    # --- CONTROLE ---
+
+    def ligar(self, taxa_amostragem=None):
+        """Liga o perfilador (e, opcionalmente, ajusta a taxa de amostragem)."""
+        with self._trava:
+            if taxa_amostragem is not None:
+                self.taxa_amostragem = max(0.0, min(1.0, float(taxa_amostragem)))
+            if self.ativo:
+                return
+            self.ativo = True
+            self._parar_amostrador = threading.Event()
+            self._amostrador = threading.Thread(
+                target=self._laco_amostragem, args=(self._parar_amostrador,), name="perfilador", daemon=True
+            )
+            self._amostrador.start()
+        logging.info(f"Perfilador ligado (taxa de amostragem: {self.taxa_amostragem:.0%}).")
+
+    def desligar(self):
+        """Desliga o perfilador e grava o que foi coletado até agora."""
+        with self._trava:
+            if not self.ativo:
+                return []
+            self.ativo = False
+            amostrador = self._amostrador
+            # Cada amostrador para pelo SEU Event, não pelo 'ativo': se alguém ligar de novo
+            # antes do join(), o amostrador antigo sai mesmo assim e o novo segue rodando
+            self._parar_amostrador.set()
+            self._amostrador = None
+            self._parar_amostrador = None
+        amostrador.join()
+        logging.info("Perfilador desligado.")
+        return self.gravar()
+
+    def alternar(self):
+        """Liga se estiver desligado, desliga se estiver ligado."""
+        if self.ativo:
+            self.desligar()
+        else:
+            self.ligar()
+
+    def status(self):
+        """Retorna um resumo do estado atual do perfilador."""
+        with self._trava:
+            return {
+                "ativo": self.ativo,
+                "taxa_amostragem": self.taxa_amostragem,
+                "requisicoes": dict(self._requisicoes),
+                "amostras": {cmd: sum(c.values()) for cmd, c in self._pilhas.items()},
+            }
+
+    # --- INSTRUMENTAÇÃO ---
+
+    def perfilar(self, extrair_comando):
+        """
+        Decorator para a rota do webhook. 'extrair_comando' é chamado (só quando
+        a requisição for sorteada) e devolve o nome usado para agregar as amostras.
+        """
+        def decorator(funcao):
+            @wraps(funcao)
+            def wrapper(*args, **kwargs):
+                if not self.ativo or random.random() >= self.taxa_amostragem:
+                    return funcao(*args, **kwargs)
+
+                ident = threading.get_ident()
+                try:
+                    comando = extrair_comando()
+                except Exception:
+                    comando = 'outros' # O perfilador nunca pode derrubar a requisição
+                with self._trava:
+                    self._threads_alvo[ident] = comando
+                    self._requisicoes[comando] += 1
+                try:
+                    return funcao(*args, **kwargs)
+                finally:
+                    with self._trava:
+                        self._threads_alvo.pop(ident, None)
+            return wrapper
+        return decorator
+
+    def _laco_amostragem(self, parar):
+        """Thread que coleta as pilhas das requisições sorteadas até o Event 'parar' ser acionado."""
+        while not parar.wait(self.intervalo):
+            with self._trava:
+                alvos = dict(self._threads_alvo)
+            if alvos:
+                frames = sys._current_frames()
+                amostras = []
+                for ident, comando in alvos.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        amostras.append((comando, self._pilha_collapsed(frame)))
+                with self._trava:
+                    for comando, pilha in amostras:
+                        self._pilhas[comando][pilha] += 1
+
+    @staticmethod
+    def _pilha_collapsed(frame):
+        """Transforma um frame em 'raiz;...;folha' (formato collapsed do flamegraph)."""
+        partes = []
+        while frame is not None:
+            codigo = frame.f_code
+            nome_arquivo = os.path.basename(codigo.co_filename)
+            partes.append(f"{codigo.co_name} ({nome_arquivo}:{frame.f_lineno})")
+            frame = frame.f_back
+        partes.reverse()
+        return ";".join(p.replace(";", ",") for p in partes)
+
+    # --- SAÍDA ---
+
+    def gravar(self):
+        """
+        Grava um arquivo .folded por comando na pasta de saída e retorna a lista de
+        arquivos gravados. Só desconta dos contadores o que foi gravado com sucesso:
+        se a escrita falhar, as amostras continuam aqui para a próxima tentativa.
+        """
+        with self._trava:
+            pilhas = {comando: Counter(contagem) for comando, contagem in self._pilhas.items()}
+            self._sequencia += 1
+            sequencia = self._sequencia
+
+        if not pilhas:
+            return []
+
+        os.makedirs(self.pasta_saida, exist_ok=True)
+        # Milissegundos + sequência: duas gravações seguidas nunca caem no mesmo arquivo
+        carimbo = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{sequencia}"
+        arquivos = []
+        for comando, contagem in pilhas.items():
+            nome_seguro = "".join(c if c.isalnum() else "_" for c in comando.lstrip("/"))[:50] or "raiz"
+            caminho = os.path.join(self.pasta_saida, f"perfil-{nome_seguro}-{carimbo}.folded")
+            with open(caminho, "a", encoding="utf-8") as arquivo:  # "a": nunca apaga amostras já gravadas
+                for pilha, amostras in contagem.most_common():
+                    arquivo.write(f"{comando};{pilha} {amostras}\n")
+            arquivos.append(caminho)
+
+            # Gravou: desconta essas amostras (as coletadas durante a escrita ficam para a próxima)
+            with self._trava:
+                restante = self._pilhas[comando]
+                restante.subtract(contagem)
+                restante = +restante  # Remove as pilhas que zeraram
+                if restante:
+                    self._pilhas[comando] = restante
+                else:
+                    del self._pilhas[comando]
+                self._requisicoes.pop(comando, None)
+
+        logging.info(f"Perfis gravados: {', '.join(arquivos)}")
+        return arquivos
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Os módulos do backend se importam pelo nome (ex: 'from dinheiro import ...'),
+# como quando rodamos 'python backend/app.py'.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
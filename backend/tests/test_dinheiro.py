@@ -0,0 +1,51 @@
+import pytest
+from hypothesis import given, strategies as st
+
+from dinheiro import LIMITE_CENTAVOS, formatar_centavos, para_centavos
+
+centavos_validos = st.integers(min_value=-LIMITE_CENTAVOS, max_value=LIMITE_CENTAVOS)
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ("50", 5000),
+    ("50,90", 5090),
+    ("50.90", 5090),
+    ("50,9", 5090),
+    ("1.234,56", 123456),
+    ("R$ 10", 1000),
+    ("R$ 1.000.000,00", 100000000),
+    ("+5", 500),
+    ("-3,10", -310),
+    (50.9, 5090),
+    (7, 700),
+])
+def test_para_centavos_formatos_aceitos(texto, esperado):
+    assert para_centavos(texto) == esperado
+
+
+@pytest.mark.parametrize("texto", [
+    "abc", "", "nan", "inf", "sNaN", True,
+    "50,999", "1.234", 0.1 + 0.2,       # mais de 2 casas decimais: nunca arredonda
+    "1e30", "1e20", 10**17,             # acima do limite
+    "1_000", "1e2", "1E+2",             # Decimal aceitaria, mas não é formato de dinheiro
+    "1.2.3,4", "1,2,3", ",5", "5,",
+])
+def test_para_centavos_rejeita_com_value_error(texto):
+    with pytest.raises(ValueError):
+        para_centavos(texto)
+
+
+def test_limite_por_transacao():
+    maximo = formatar_centavos(LIMITE_CENTAVOS)  # '100000000000.00' (R$ 100 bilhões)
+    assert para_centavos(maximo) == LIMITE_CENTAVOS
+    assert para_centavos('-' + maximo) == -LIMITE_CENTAVOS
+    for acima in (formatar_centavos(LIMITE_CENTAVOS + 1), '92233720368547758,07', LIMITE_CENTAVOS // 100 + 1):
+        with pytest.raises(ValueError, match="fora do limite"):
+            para_centavos(acima)
+
+
+@given(centavos_validos)
+def test_formatar_e_converter_de_volta_e_exato(centavos):
+    texto = formatar_centavos(centavos)
+    assert para_centavos(texto) == centavos
+    assert para_centavos(texto.replace('.', ',')) == centavos
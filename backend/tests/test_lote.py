@@ -0,0 +1,148 @@
+import io
+import json
+import sqlite3
+
+import pytest
+
+import cria_banco as cb
+
+
+def _roda(caminho, linhas, tamanho_lote=5000):
+    saida = io.StringIO()
+    total, erros = cb.executar_lote(iter(linhas), saida, caminho, tamanho_lote)
+    return total, erros, [json.loads(linha) for linha in saida.getvalue().splitlines()]
+
+
+def _ids_commitados(caminho):
+    """IDs visíveis para OUTRA conexão, ou seja, que já passaram pelo COMMIT."""
+    conexao = sqlite3.connect(caminho)
+    try:
+        return {linha[0] for linha in conexao.execute('SELECT id FROM transacoes')}
+    finally:
+        conexao.close()
+
+
+class SaidaQueConfereCommit(io.StringIO):
+    """Saída que, a cada escrita, confere se os IDs impressos como 'ok' já estão no banco."""
+
+    def __init__(self, caminho):
+        super().__init__()
+        self.caminho = caminho
+        self.escritas = 0
+
+    def write(self, texto):
+        self.escritas += 1
+        commitados = _ids_commitados(self.caminho)
+        for linha in texto.splitlines():
+            resultado = json.loads(linha)
+            if resultado['ok'] and 'id' in resultado:
+                assert resultado['id'] in commitados, f"impresso antes do COMMIT: {resultado}"
+        return super().write(texto)
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    return str(tmp_path / 'lote.db')
+
+
+def test_linhas_em_texto_e_json(caminho):
+    total, erros, resultados = _roda(caminho, [
+        'add despesa 50,90 mercado',
+        '{"op": "add", "tipo": "receita", "valor": 1000, "descricao": "salario", "data": "2024-01-05"}',
+        'update 1 valor 60',
+        '{"op": "update", "id": 1, "campo": "descricao", "valor": "feira"}',
+        'saldo 2024-01-01 2024-01-31',
+        'delete 2',
+        '{"op": "balance"}',
+    ])
+
+    assert (total, erros) == (7, 0)
+    assert [r['op'] for r in resultados] == ['add', 'add', 'update', 'update', 'saldo', 'del', 'saldo']
+    assert resultados[0]['id'] == 1 and resultados[1]['id'] == 2
+    assert resultados[4]['receitas_centavos'] == 100000
+    assert resultados[5]['linhas_afetadas'] == 1
+    assert resultados[6] == {'linha': 7, 'op': 'saldo', 'ok': True,
+                             'receitas_centavos': 0, 'despesas_centavos': 6000, 'saldo_centavos': -6000}
+
+
+def test_linhas_vazias_e_comentarios_sao_ignorados(caminho):
+    total, erros, resultados = _roda(caminho, ['', '# comentário', '   ', 'saldo'])
+
+    assert (total, erros) == (1, 0)
+    assert resultados[0]['linha'] == 4
+
+
+@pytest.mark.parametrize('linha, op', [
+    ('bogus', None),
+    ('{"op": "add"', None),                  # JSON quebrado
+    ('[1, 2]', None),
+    ('saldo 2024-01-01', None),              # Só uma data
+    ('add despesa 1e30 x', 'add'),
+    ('add despesa 50,999 x', 'add'),
+    ('add outro 10 x', 'add'),
+    ('update 1 campo_invalido 3', 'update'),
+    ('del abc', 'del'),
+    ('{"op": "add", "tipo": 5, "valor": 1, "descricao": "x"}', 'add'),
+])
+def test_linha_ruim_vira_erro_e_o_lote_continua(caminho, linha, op):
+    total, erros, resultados = _roda(caminho, ['add receita 10 antes', linha, 'add receita 20 depois'])
+
+    assert (total, erros) == (3, 1)
+    assert resultados[1]['ok'] is False and resultados[1]['op'] == op and resultados[1]['erro']
+    assert [r['ok'] for r in resultados] == [True, False, True]
+    # Erro e sucesso têm as mesmas chaves fixas
+    assert all({'linha', 'op', 'ok'} <= set(r) for r in resultados)
+    assert _ids_commitados(caminho) == {1, 2}
+
+
+def test_resultados_so_sao_impressos_depois_do_commit(caminho):
+    saida = SaidaQueConfereCommit(caminho)
+    linhas = [f'add despesa {i} item{i}' for i in range(1, 8)]
+
+    cb.executar_lote(iter(linhas), saida, caminho, tamanho_lote=3)
+
+    assert saida.escritas == 3  # Lotes de 3 + 3 + 1
+    assert len(saida.getvalue().splitlines()) == 7
+
+
+def test_erro_fatal_nao_imprime_o_lote_desfeito(caminho, capsys):
+    def entrada():
+        yield 'add despesa 1 a'
+        yield 'add despesa 2 b'   # Fecha o primeiro lote (COMMIT)
+        yield 'add despesa 3 c'   # Fica no lote aberto...
+        raise OSError("leitura da entrada falhou")  # ...que sofre ROLLBACK
+
+    saida = io.StringIO()
+    with pytest.raises(OSError):
+        cb.executar_lote(entrada(), saida, caminho, tamanho_lote=2)
+
+    assert [json.loads(linha)['id'] for linha in saida.getvalue().splitlines()] == [1, 2]
+    assert _ids_commitados(caminho) == {1, 2}
+    capturado = capsys.readouterr()
+    assert capturado.out == '' and 'Erro ocorrido' in capturado.err  # Nada além de JSON no stdout
+
+
+def test_tamanho_lote_invalido(caminho):
+    with pytest.raises(ValueError):
+        cb.executar_lote(iter(['saldo']), io.StringIO(), caminho, tamanho_lote=0)
+
+
+@pytest.mark.parametrize('valor', ['0', '-3', 'abc'])
+def test_cli_rejeita_tamanho_lote_invalido(caminho, valor):
+    with pytest.raises(SystemExit) as erro:
+        cb.main(['--lote', '-', '--db', caminho, '--tamanho-lote', valor])
+    assert erro.value.code == 2
+
+
+def test_cli_codigo_de_saida(tmp_path, caminho, capsys):
+    sem_erros = tmp_path / 'ok.txt'
+    sem_erros.write_text('add despesa 10 x\nsaldo\n', encoding='utf-8')
+    com_erro = tmp_path / 'erro.txt'
+    com_erro.write_text('add despesa 10 x\nbogus\n', encoding='utf-8')
+
+    assert cb.main(['--lote', str(sem_erros), '--db', caminho]) == 0
+    assert cb.main(['--lote', str(com_erro), '--db', caminho]) == 1
+
+    capturado = capsys.readouterr()
+    assert all(json.loads(linha) for linha in capturado.out.splitlines())  # stdout: só JSON
+    assert '1 com erro' in capturado.err
@@ -0,0 +1,159 @@
+import os
+import re
+import threading
+import time
+
+import pytest
+
+from perfilador import PerfiladorAmostragem
+
+
+def _ocupado(segundos=0.05):
+    """Simula uma requisição que gasta CPU por alguns milissegundos."""
+    fim = time.perf_counter() + segundos
+    while time.perf_counter() < fim:
+        sum(range(100))
+
+
+def _amostradores_vivos():
+    return [t for t in threading.enumerate() if t.name == "perfilador" and t.is_alive()]
+
+
+@pytest.fixture
+def perfilador(tmp_path):
+    perfilador = PerfiladorAmostragem(str(tmp_path / "perfis"), taxa_amostragem=1.0, intervalo=0.001)
+    yield perfilador
+    perfilador.desligar()
+
+
+def test_desligado_nao_amostra_nada(perfilador):
+    chamadas = []
+    rota = perfilador.perfilar(lambda: chamadas.append(1) or '/saldo')(_ocupado)
+
+    rota()
+
+    assert chamadas == []  # Desligado, nem o extrator de comando é chamado
+    assert perfilador.status()["amostras"] == {}
+    assert perfilador.gravar() == []
+
+
+def test_taxa_zero_nao_amostra_nenhuma_requisicao(perfilador):
+    rota = perfilador.perfilar(lambda: '/saldo')(_ocupado)
+    perfilador.ligar(taxa_amostragem=0.0)
+
+    rota()
+
+    assert perfilador.status()["requisicoes"] == {}
+
+
+def test_agrega_amostras_por_comando(perfilador):
+    comando_atual = ['/saldo']
+    rota = perfilador.perfilar(lambda: comando_atual[0])(_ocupado)
+    perfilador.ligar()
+
+    rota()
+    comando_atual[0] = '/add'
+    rota()
+    rota()
+
+    status = perfilador.status()
+    assert status["requisicoes"] == {'/saldo': 1, '/add': 2}
+    assert status["amostras"]['/saldo'] > 0 and status["amostras"]['/add'] > 0
+
+
+def test_extrator_com_erro_nao_derruba_a_rota(perfilador):
+    def extrator_quebrado():
+        raise AttributeError("payload estranho")
+
+    rota = perfilador.perfilar(extrator_quebrado)(lambda: "resposta")
+    perfilador.ligar()
+
+    assert rota() == "resposta"
+    assert perfilador.status()["requisicoes"] == {'outros': 1}
+
+
+def test_grava_formato_folded(perfilador):
+    rota = perfilador.perfilar(lambda: '/listar')(_ocupado)
+    perfilador.ligar()
+    rota()
+
+    arquivos = perfilador.desligar()
+
+    assert len(arquivos) == 1 and os.path.basename(arquivos[0]).startswith("perfil-listar-")
+    with open(arquivos[0], encoding="utf-8") as arquivo:
+        linhas = arquivo.read().splitlines()
+    assert linhas
+    for linha in linhas:
+        # 'comando;raiz;...;folha contagem': o formato do flamegraph.pl
+        assert re.fullmatch(r"/listar(;[^;]+)+ \d+", linha), linha
+    assert any("_ocupado (test_perfilador.py:" in linha for linha in linhas)
+    assert perfilador.status()["amostras"] == {}  # Gravou: contadores zerados
+
+
+def test_gravacoes_seguidas_nao_sobrescrevem(perfilador):
+    rota = perfilador.perfilar(lambda: '/saldo')(_ocupado)
+    perfilador.ligar()
+    rota()
+    primeiro = perfilador.gravar()
+    rota()
+    segundo = perfilador.desligar()
+
+    assert primeiro and segundo and set(primeiro).isdisjoint(segundo)
+    assert all(os.path.exists(caminho) for caminho in primeiro + segundo)
+
+
+def test_comando_enorme_nao_quebra_o_nome_do_arquivo(perfilador):
+    rota = perfilador.perfilar(lambda: '/' + 'x' * 1000)(_ocupado)
+    perfilador.ligar()
+    rota()
+
+    arquivos = perfilador.desligar()
+
+    assert len(arquivos) == 1 and len(os.path.basename(arquivos[0])) < 100
+
+
+def test_falha_ao_gravar_mantem_as_amostras(tmp_path):
+    caminho_invalido = tmp_path / "um_arquivo"
+    caminho_invalido.write_text("não é uma pasta")
+    perfilador = PerfiladorAmostragem(str(caminho_invalido), taxa_amostragem=1.0, intervalo=0.001)
+    rota = perfilador.perfilar(lambda: '/saldo')(_ocupado)
+    perfilador.ligar()
+    rota()
+
+    with pytest.raises(OSError):
+        perfilador.desligar()
+
+    assert perfilador.status()["amostras"]['/saldo'] > 0
+    perfilador.pasta_saida = str(tmp_path / "perfis")
+    assert len(perfilador.gravar()) == 1
+
+
+def test_ligar_e_desligar_varias_vezes(perfilador):
+    for _ in range(5):
+        perfilador.ligar()
+        perfilador.ligar()  # Ligar de novo não cria um segundo amostrador
+        assert len(_amostradores_vivos()) == 1
+        perfilador.desligar()
+        assert _amostradores_vivos() == []
+
+
+def test_desligar_e_ligar_concorrentes_nao_travam(tmp_path):
+    # O amostrador dorme bastante: o ligar() acontece antes de ele acordar e ver que foi desligado
+    perfilador = PerfiladorAmostragem(str(tmp_path), taxa_amostragem=1.0, intervalo=0.2)
+
+    def desligar_com_prazo():
+        desligando = threading.Thread(target=perfilador.desligar, daemon=True)
+        desligando.start()
+        return desligando
+
+    for _ in range(10):
+        perfilador.ligar()
+        desligando = desligar_com_prazo()
+        perfilador.ligar()
+        desligando.join(timeout=2)
+        assert not desligando.is_alive(), "desligar() travou no join()"
+
+        desligando = desligar_com_prazo()
+        desligando.join(timeout=2)
+        assert not desligando.is_alive(), "desligar() travou no join()"
+        assert _amostradores_vivos() == []
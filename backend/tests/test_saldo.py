@@ -0,0 +1,136 @@
+import sqlite3
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+import cria_banco as cb
+from dinheiro import LIMITE_CENTAVOS, formatar_centavos, para_centavos
+
+# Valores de até R$ 1 bilhão: mesmo milhares deles somados cabem em um INTEGER do SQLite
+transacoes = st.lists(
+    st.tuples(
+        st.sampled_from(['receita', 'despesa']),
+        st.integers(min_value=1, max_value=100_000_000_000),
+        st.sampled_from(['2024-01-15', '2024-02-15', '2024-03-15']),
+    ),
+    max_size=300,
+)
+
+
+def _banco_com(executor, lista):
+    cb.cria_banco(executor)
+    for tipo, centavos, data in lista:
+        cb.adiciona_transacao(executor, tipo, 'teste', centavos, data)
+
+
+@settings(max_examples=200)
+@given(transacoes)
+def test_calcular_saldo_e_exato(lista):
+    with cb.GerenciadorBanco(':memory:') as executor:
+        _banco_com(executor, lista)
+        resultado = cb.calcular_saldo(executor)
+
+    receitas = sum(v for t, v, _ in lista if t == 'receita')
+    despesas = sum(v for t, v, _ in lista if t == 'despesa')
+    assert resultado == (receitas, despesas, receitas - despesas)
+    assert all(type(total) is int for total in resultado)
+
+
+@settings(max_examples=100)
+@given(transacoes)
+def test_calcular_saldo_periodo_e_exato(lista):
+    with cb.GerenciadorBanco(':memory:') as executor:
+        _banco_com(executor, lista)
+        resultado = cb.calcular_saldo_periodo(executor, '2024-02-01', '2024-02-29')
+
+    no_periodo = [(t, v) for t, v, d in lista if d == '2024-02-15']
+    receitas = sum(v for t, v in no_periodo if t == 'receita')
+    despesas = sum(v for t, v in no_periodo if t == 'despesa')
+    assert resultado == (receitas, despesas, receitas - despesas)
+
+
+def test_dez_centavos_somados_dez_vezes_da_um_real_exato():
+    # Com REAL, 0.1 somado 10 vezes dá 0.9999999999999999
+    with cb.GerenciadorBanco(':memory:') as executor:
+        _banco_com(executor, [('receita', para_centavos('0,10'), '2024-01-01')] * 10)
+        receitas, _, _ = cb.calcular_saldo(executor)
+    assert formatar_centavos(receitas) == '1.00'
+
+
+def test_soma_acima_do_inteiro_de_64_bits_continua_exata():
+    # Transações no limite (R$ 100 bilhões) até a soma passar de 2^63 - 1:
+    # o SUM do SQLite daria 'integer overflow' e travaria o /saldo para sempre
+    quantidade = (2**63 - 1) // LIMITE_CENTAVOS + 1
+    with cb.GerenciadorBanco(':memory:') as executor:
+        cb.cria_banco(executor)
+        executor.executemany(
+            "INSERT INTO transacoes (tipo, descricao, valor, data) VALUES ('receita', 'teto', ?, '2024-01-01')",
+            [(LIMITE_CENTAVOS,)] * quantidade,
+        )
+        cb.adiciona_transacao(executor, 'despesa', 'pequena', 1, '2024-01-01')
+
+        esperado = (quantidade * LIMITE_CENTAVOS, 1, quantidade * LIMITE_CENTAVOS - 1)
+        assert esperado[0] > 2**63 - 1
+        assert cb.calcular_saldo(executor) == esperado
+        assert cb.calcular_saldo_periodo(executor, '2024-01-01', '2024-01-31') == esperado
+
+
+def _cria_banco_antigo(caminho, valores):
+    """Cria um banco no formato antigo (valor REAL, em reais)."""
+    conexao = sqlite3.connect(caminho)
+    conexao.execute('''
+        CREATE TABLE transacoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tipo TEXT NOT NULL,
+            descricao TEXT NOT NULL,
+            valor REAL NOT NULL,
+            data TEXT NOT NULL
+        )
+    ''')
+    conexao.executemany(
+        "INSERT INTO transacoes (tipo, descricao, valor, data) VALUES (?, ?, ?, '2024-01-01')", valores
+    )
+    conexao.commit()
+    conexao.close()
+
+
+def test_migracao_converte_real_para_centavos_uma_unica_vez(tmp_path):
+    caminho = str(tmp_path / 'antigo.db')
+    _cria_banco_antigo(caminho, [('receita', 'salario', 3200.0), ('despesa', 'mercado', 50.9), ('despesa', 'apagada', 1.0)])
+    conexao = sqlite3.connect(caminho)
+    conexao.execute('DELETE FROM transacoes WHERE id = 3')
+    conexao.commit()
+    conexao.close()
+
+    with cb.GerenciadorBanco(caminho) as executor:
+        cb.cria_banco(executor)
+        novo_id = cb.adiciona_transacao(executor, 'receita', 'nova', 100, '2024-01-02')
+    with cb.GerenciadorBanco(caminho) as executor:
+        cb.cria_banco(executor)  # Segunda chamada não pode multiplicar por 100 de novo
+        linhas = cb.listar_transacoes(executor)
+
+    assert novo_id == 4  # O ID 3 (deletado) não é reaproveitado
+    assert [(linha[0], linha[3]) for linha in linhas] == [(1, 320000), (2, 5090), (4, 100)]
+
+
+@pytest.mark.parametrize('valor_invalido', [
+    1.005,   # Mais de 2 casas: ROUND em float daria 100 centavos, perdendo meio centavo
+    0.285,   # ROUND(28.499999...) daria 28
+    1e12,    # R$ 1 trilhão: acima do limite por transação
+    1e17,    # O CAST para INTEGER travaria em 9223372036854775807
+])
+def test_migracao_aborta_sem_alterar_nada_se_um_valor_nao_for_exato(tmp_path, valor_invalido):
+    caminho = str(tmp_path / 'antigo.db')
+    _cria_banco_antigo(caminho, [('receita', 'ok', 10.5), ('despesa', 'problema', valor_invalido)])
+
+    with pytest.raises(ValueError, match=r"abortada.*ID 2"):
+        with cb.GerenciadorBanco(caminho) as executor:
+            cb.cria_banco(executor)
+
+    conexao = sqlite3.connect(caminho)
+    try:
+        assert conexao.execute('PRAGMA user_version').fetchone()[0] == 0
+        assert conexao.execute("SELECT type FROM pragma_table_info('transacoes') WHERE name = 'valor'").fetchone()[0] == 'REAL'
+        assert conexao.execute('SELECT valor FROM transacoes ORDER BY id').fetchall() == [(10.5,), (valor_invalido,)]
+    finally:
+        conexao.close()